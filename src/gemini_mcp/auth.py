@@ -1,41 +1,97 @@
+from collections import OrderedDict
+
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response, JSONResponse
 
+# Common spellings of the auth scheme, checked before falling back to lower()
+_BEARER_SCHEMES = frozenset({"Bearer", "bearer", "BEARER"})
+
+_MISSING_HEADER = "Authorization header missing"
+_INVALID_HEADER = "Invalid Authorization header. Must be 'Bearer <token>'"
+_INVALID_TOKEN = "Invalid token. Must be a AI Studio token"
+
+# The 401 bodies are static, so they are JSON-encoded once. A new Response is still
+# created per request because other middleware may mutate response headers in place.
+_ERROR_BODIES = {
+    detail: JSONResponse(content={"detail": detail}).body
+    for detail in (_MISSING_HEADER, _INVALID_HEADER, _INVALID_TOKEN)
+}
+
+# Headers that passed validation, mapped to their token. Rejected headers are never
+# stored, so malformed or oversized values cannot push out cached ones.
+_TOKEN_CACHE_MAXSIZE = 1024
+_TOKEN_CACHE: "OrderedDict[str, str]" = OrderedDict()
+
+# Longer values are still validated, just not cached (AI Studio keys are ~40 chars)
+_MAX_CACHED_HEADER_LENGTH = 256
+
+
+def _unauthorized(detail: str) -> Response:
+    return Response(
+        _ERROR_BODIES[detail], status_code=401, media_type="application/json"
+    )
+
+
+def _validate_auth_header(auth_header: str) -> tuple[str | None, str | None]:
+    """
+    Parse an Authorization header value.
+
+    Returns:
+        tuple: (token, error) - exactly one of them is set
+    """
+    # Checks if the header is in the correct format, without splitting it into parts.
+    # Whitespace means the same as for str.split(), not just spaces and tabs.
+    scheme = auth_header[:6]
+    token = auth_header[7:].strip()
+    if (
+        not auth_header[6:7].isspace()
+        or (scheme not in _BEARER_SCHEMES and scheme.lower() != "bearer")
+        or not token
+        or any(c.isspace() for c in token)
+    ):
+        return None, _INVALID_HEADER
+
+    # Checks if the token is a AI Studio token (does not check if it is valid)
+    if not token.startswith("AI"):
+        return None, _INVALID_TOKEN
+
+    return token, None
+
+
+def _get_bearer_token(auth_header: str) -> tuple[str | None, str | None]:
+    """Validate an Authorization header, reusing the result for headers seen before."""
+    token = _TOKEN_CACHE.get(auth_header)
+    if token is not None:
+        _TOKEN_CACHE.move_to_end(auth_header)
+        return token, None
+
+    token, error = _validate_auth_header(auth_header)
+    if token is not None and len(auth_header) <= _MAX_CACHED_HEADER_LENGTH:
+        _TOKEN_CACHE[auth_header] = token
+        if len(_TOKEN_CACHE) > _TOKEN_CACHE_MAXSIZE:
+            _TOKEN_CACHE.popitem(last=False)
+    return token, error
+
 
 class BearerTokenAuthMiddleware(BaseHTTPMiddleware):
     def __init__(self, app):
         super().__init__(app)
 
     async def dispatch(self, request: Request, call_next) -> Response:
-        # Exclude the root path from authentication
-        if request.url.path == "/":
+        # Exclude the root path from authentication (raw scope path avoids building a URL)
+        if request.scope["path"] == "/":
             return await call_next(request)
         # Check if the header is missing
         auth_header = request.headers.get("Authorization")
         if not auth_header:
-            return JSONResponse(
-                status_code=401, content={"detail": "Authorization header missing"}
-            )
-
-        # Checks if the header is in the correct format
-        parts = auth_header.split()
-        if len(parts) != 2 or parts[0].lower() != "bearer":
-            return JSONResponse(
-                status_code=401,
-                content={
-                    "detail": "Invalid Authorization header. Must be 'Bearer <token>'"
-                },
-            )
-
-        # Checks if the token is a AI Studio token (does not check if it is valid)
-        if not parts[1].startswith("AI"):
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Invalid token. Must be a AI Studio token"},
-            )
-
-        token = parts[1]
+            return _unauthorized(_MISSING_HEADER)
+
+        # Clients resend the same header on every request, so valid ones are cached
+        token, error = _get_bearer_token(auth_header)
+        if error:
+            return _unauthorized(error)
+
         request.state.bearer_token = token
 
         response = await call_next(request)
@@ -1,71 +1,87 @@
 import os
+import sys
 import logging
-from typing import Dict
-from pydantic import BaseModel, Field, field_validator
-from functools import lru_cache
+from dataclasses import dataclass
+from types import MappingProxyType
+from collections.abc import Mapping
+from functools import cache, lru_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-
-class ModelConfig(BaseModel):
-    """Configuration class for Gemini model settings."""
-
-    web_search_model: str = Field(
-        default="gemini-flash-latest",
-        description="Model to use for web search functionality",
-    )
-    default_model: str = Field(
-        default="gemini-flash-lite-latest", description="Default model for general use"
-    )
-    advanced_model: str = Field(
-        default="gemini-2.5-pro",
-        description="Advanced model for complex tasks",
-    )
-
-    @field_validator("web_search_model")
-    @classmethod
-    def validate_web_search_model(cls, v):
-        """Validate web search model name."""
-        if not v.startswith("gemini-"):
-            logger.warning(f"Invalid web search model format: {v}")
-            raise ValueError(f"Invalid model format: {v}. Must start with 'gemini-'")
-        return v
-
-    @field_validator("default_model")
-    @classmethod
-    def validate_default_model(cls, v):
-        """Validate default model name."""
-        if not v.startswith("gemini-"):
-            logger.warning(f"Invalid default model format: {v}")
-            raise ValueError(f"Invalid model format: {v}. Must start with 'gemini-'")
-        return v
-
-    @field_validator("advanced_model")
-    @classmethod
-    def validate_advanced_model(cls, v):
-        """Validate advanced model name."""
-        if not v.startswith("gemini-"):
-            logger.warning(f"Invalid advanced model format: {v}")
-            raise ValueError(f"Invalid model format: {v}. Must start with 'gemini-'")
-        return v
-
-
-@lru_cache(maxsize=1)
-def get_config() -> ModelConfig:
-    """Load and cache configuration from environment variables."""
+# Interned so configs built from matching environment values compare by identity
+DEFAULT_WEB_SEARCH_MODEL = sys.intern("gemini-flash-latest")
+DEFAULT_MODEL = sys.intern("gemini-flash-lite-latest")
+DEFAULT_ADVANCED_MODEL = sys.intern("gemini-2.5-pro")
+
+# Known model names are accepted with a single set lookup; anything else must
+# still follow the "gemini-" naming scheme.
+_KNOWN_MODELS = frozenset(
+    {
+        "gemini-flash-latest",
+        "gemini-flash-lite-latest",
+        "gemini-2.5-pro",
+        "gemini-2.5-flash",
+        "gemini-2.5-flash-lite",
+    }
+)
+
+_ERR_TMPL = "Invalid model format: {0}. Must start with 'gemini-'".format
+
+
+def _is_valid_model(name: str) -> bool:
+    """Check whether a model name is known or follows the gemini- naming scheme."""
+    return name in _KNOWN_MODELS or name.startswith("gemini-")
+
+
+@dataclass(frozen=True, slots=True)
+class ModelConfig:
+    """Configuration class for Gemini model settings.
+
+    Attributes:
+        web_search_model: Model to use for web search functionality
+        default_model: Default model for general use
+        advanced_model: Advanced model for complex tasks
+    """
+
+    web_search_model: str = DEFAULT_WEB_SEARCH_MODEL
+    default_model: str = DEFAULT_MODEL
+    advanced_model: str = DEFAULT_ADVANCED_MODEL
+
+    def __post_init__(self):
+        """Validate all model names, logging a warning for each invalid one."""
+        invalid = None
+        for label, value in (
+            ("web search", self.web_search_model),
+            ("default", self.default_model),
+            ("advanced", self.advanced_model),
+        ):
+            if not _is_valid_model(value):
+                logger.warning(f"Invalid {label} model format: {value}")
+                if invalid is None:
+                    invalid = value
+        if invalid is not None:
+            raise ValueError(_ERR_TMPL(invalid))
+
+
+@cache
+def _build_config(
+    web_search_model: str, default_model: str, advanced_model: str
+) -> ModelConfig:
+    """Build and validate the configuration for one set of environment values."""
+    for env_var, value, default in (
+        ("GEMINI_WEB_SEARCH_MODEL", web_search_model, DEFAULT_WEB_SEARCH_MODEL),
+        ("GEMINI_DEFAULT_MODEL", default_model, DEFAULT_MODEL),
+        ("GEMINI_ADVANCED_MODEL", advanced_model, DEFAULT_ADVANCED_MODEL),
+    ):
+        if value != default:
+            logger.info(f"Using custom {env_var}: {value}")
     try:
         config = ModelConfig(
-            web_search_model=_get_env_with_default(
-                "GEMINI_WEB_SEARCH_MODEL", "gemini-flash-latest"
-            ),
-            default_model=_get_env_with_default(
-                "GEMINI_DEFAULT_MODEL", "gemini-flash-lite-latest"
-            ),
-            advanced_model=_get_env_with_default(
-                "GEMINI_ADVANCED_MODEL", "gemini-2.5-pro"
-            ),
+            web_search_model=sys.intern(web_search_model),
+            default_model=sys.intern(default_model),
+            advanced_model=sys.intern(advanced_model),
         )
         logger.info("Configuration loaded successfully")
         return config
@@ -74,42 +90,65 @@ def get_config() -> ModelConfig:
         return ModelConfig()
 
 
-def clear_config_cache():
-    """Clear the configuration cache to force reload."""
-    get_config.cache_clear()
+def get_config() -> ModelConfig:
+    """
+    Load configuration from environment variables.
+
+    The result is cached per combination of environment values, so changing an
+    environment variable takes effect on the next call without clearing the cache.
+    """
+    return _build_config(
+        os.getenv("GEMINI_WEB_SEARCH_MODEL", DEFAULT_WEB_SEARCH_MODEL),
+        os.getenv("GEMINI_DEFAULT_MODEL", DEFAULT_MODEL),
+        os.getenv("GEMINI_ADVANCED_MODEL", DEFAULT_ADVANCED_MODEL),
+    )
 
 
-def _get_env_with_default(env_var: str, default: str) -> str:
-    """Get environment variable with default value."""
-    value = os.getenv(env_var, default)
-    if value != default:
-        logger.info(f"Using custom {env_var}: {value}")
-    return value
+def clear_config_cache():
+    """Clear the configuration cache to force reload."""
+    _build_config.cache_clear()
+    _models_for_config.cache_clear()
 
 
 def get_model_for_web_search() -> str:
     """Get the configured model for web search."""
-    config = get_config()
-    return config.web_search_model
+    return get_config().web_search_model
 
 
 def get_default_model() -> str:
     """Get the configured default model."""
-    config = get_config()
-    return config.default_model
+    return get_config().default_model
 
 
 def get_advanced_model() -> str:
     """Get the configured advanced model."""
-    config = get_config()
-    return config.advanced_model
+    return get_config().advanced_model
+
+
+def _make_models(config: ModelConfig) -> Mapping[str, str]:
+    """Build the read-only model mapping for a configuration."""
+    return MappingProxyType(
+        {
+            "web_search": config.web_search_model,
+            "default": config.default_model,
+            "advanced": config.advanced_model,
+        }
+    )
+
+
+@lru_cache(maxsize=1)
+def _models_for_config(config: ModelConfig) -> Mapping[str, str]:
+    """Return the model mapping for a non-default configuration, reusing the last one."""
+    return _make_models(config)
 
 
-def get_all_models() -> Dict[str, str]:
-    """Get all configured models as a dictionary."""
+_DEFAULT_CONFIG = ModelConfig()
+_DEFAULT_MODELS = _make_models(_DEFAULT_CONFIG)
+
+
+def get_all_models() -> Mapping[str, str]:
+    """Get all configured models as a read-only mapping."""
     config = get_config()
-    return {
-        "web_search": config.web_search_model,
-        "default": config.default_model,
-        "advanced": config.advanced_model,
-    }
+    if config == _DEFAULT_CONFIG:
+        return _DEFAULT_MODELS
+    return _models_for_config(config)
@@ -1,12 +1,16 @@
 from fastmcp import FastMCP
 from starlette.middleware import Middleware
-import inspect
+from functools import partial
+import anyio
+import asyncio
 from gemini_mcp import tools
 import argparse
 import os
+import sys
 from gemini_mcp.auth import BearerTokenAuthMiddleware
+from gemini_mcp.utils import refresh_transport_mode
 from fastmcp.tools import FunctionTool
-from starlette.responses import HTMLResponse
+from starlette.responses import Response
 from starlette.requests import Request
 from html import escape
 
@@ -16,24 +20,15 @@ mcp = FastMCP(
     instructions="This server is uses Gemini API models and features to help you build AI Agents.",
 )
 
-# Dynamically add all async functions from the tools module
-for name, func in inspect.getmembers(tools):
-    if inspect.isasyncgenfunction(func) or inspect.iscoroutinefunction(func):
-        if hasattr(func, "__module__") and func.__module__ == tools.__name__:
-            mcp.add_tool(tool=FunctionTool.from_function(func, name=name))
+# Add all functions registered with @tool in the tools module
+for func in tools.TOOLS:
+    mcp.add_tool(tool=FunctionTool.from_function(func, name=func.__name__))
 
 
-@mcp.custom_route("/", methods=["GET"])
-async def landing_page(request: Request):
+def _render_landing_page(connect_url: str) -> str:
     """
-    Serves a landing page with ASCII art and connection details.
+    Renders the landing page HTML with ASCII art and connection details.
     """
-    scheme = request.url.scheme
-    if "x-forwarded-proto" in request.headers:
-        scheme = request.headers["x-forwarded-proto"]
-    host = request.url.netloc
-    connect_url = f"{scheme}://{host}/mcp/"
-
     gemini_art = """         ###
        #######
       #########
@@ -110,7 +105,57 @@ async def landing_page(request: Request):
 </body>
 </html>
 """
-    return HTMLResponse(content=html_content.strip())
+    return html_content.strip()
+
+
+# Only the connect URL varies per request, so render and encode the page once and
+# split it around the URL.
+_LANDING_PREFIX, _LANDING_SUFFIX = (
+    part.encode("utf-8")
+    for part in _render_landing_page("{connect_url}").split("{connect_url}")
+)
+
+
+@mcp.custom_route("/", methods=["GET"])
+async def landing_page(request: Request):
+    """
+    Serves a landing page with ASCII art and connection details.
+    """
+    # Read the raw scope and headers instead of building request.url
+    scheme = request.headers.get("x-forwarded-proto", request.scope["scheme"])
+    host = request.headers.get("host") or request.url.netloc
+    connect_url = f"{scheme}://{host}/mcp/"
+    return Response(
+        content=_LANDING_PREFIX + connect_url.encode("utf-8") + _LANDING_SUFFIX,
+        media_type="text/html",
+    )
+
+
+if sys.version_info >= (3, 12):
+
+    def _eager_task_factory(loop, coro, *, eager_start=None, **kwargs):
+        # Like asyncio.eager_task_factory, but uvloop passes eager_start=None on 3.13+,
+        # which that factory rejects before 3.14 and treats as "not eager" after.
+        if eager_start is None:
+            eager_start = True
+        return asyncio.Task(coro, loop=loop, eager_start=eager_start, **kwargs)
+
+
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Create the server's event loop: uvloop when it is installed, starting tool tasks
+    eagerly on Python 3.12+.
+    """
+    try:
+        import uvloop
+
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        loop = asyncio.new_event_loop()
+
+    if sys.version_info >= (3, 12):
+        loop.set_task_factory(_eager_task_factory)
+    return loop
 
 
 def main():
@@ -136,7 +181,12 @@ def main():
     elif args.transport == "stdio":
         os.environ["MCP_TRANSPORT_MODE"] = "stdio"
 
-    mcp.run(**run_kwargs)
+    refresh_transport_mode()
+    # Same as mcp.run(), but on our own loop instead of a process-wide event loop policy
+    anyio.run(
+        partial(mcp.run_async, **run_kwargs),
+        backend_options={"loop_factory": _new_event_loop},
+    )
 
 
 if __name__ == "__main__":
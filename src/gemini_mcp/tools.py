@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from pydantic import Field
 from typing import Annotated, Union
 from .utils import (
@@ -14,6 +15,16 @@ from .config import (
 )
 
 
+# Functions registered as MCP tools by the server, in registration order.
+TOOLS: list[Callable] = []
+
+
+def tool(func: Callable) -> Callable:
+    """Register a function to be exposed as an MCP tool."""
+    TOOLS.append(func)
+    return func
+
+
 web_search_prompt = """Conduct targeted Google Searches to gather the most recent, credible information on "{query}" and synthesize it into a verifiable text artifact.
 
 Instructions:
@@ -28,6 +39,25 @@ Research Topic:
 """
 
 
+def _split_web_search_prompt() -> tuple[str, str, str, str]:
+    """Split web_search_prompt around its {query}, {current_date_str}, {query} placeholders."""
+    head, middle, tail = web_search_prompt.split("{query}")
+    p1, p2 = middle.split("{current_date_str}")
+    return head, p1, p2, tail
+
+
+# Split once so building the prompt is a single concatenation instead of re-parsing the
+# template with str.format.
+_WEB_SEARCH_PROMPT_PARTS = _split_web_search_prompt()
+
+
+def _format_web_search_prompt(query: str, current_date_str: str) -> str:
+    """Equivalent to web_search_prompt.format(query=..., current_date_str=...)."""
+    p0, p1, p2, p3 = _WEB_SEARCH_PROMPT_PARTS
+    return f"{p0}{query}{p1}{current_date_str}{p2}{query}{p3}"
+
+
+@tool
 async def web_search(
     query: Annotated[
         str,
@@ -54,9 +84,7 @@ async def web_search(
 
     response = await genai_client.aio.models.generate_content(
         model=web_search_model,
-        contents=web_search_prompt.format(
-            query=query, current_date_str=current_date_str
-        ),
+        contents=_format_web_search_prompt(query, current_date_str),
         config={
             "temperature": 0.0,
             "tools": [{"google_search": {}}],
@@ -66,29 +94,33 @@ async def web_search(
     structured_citations = []
     web_search_queries_used = []
 
-    if response.candidates[0].grounding_metadata:
+    grounding_metadata = response.candidates[0].grounding_metadata
+    if grounding_metadata:
         structured_citations = process_grounding_to_structured_citations(
-            response.candidates[0].grounding_metadata
+            grounding_metadata
         )
 
-        # Extract web search queries if available
-        if response.candidates[0].grounding_metadata.web_search_queries:
-            web_search_queries_used = list(
-                response.candidates[0].grounding_metadata.web_search_queries
+        # Extract web search queries if available, copying only if not already a list
+        web_search_queries = grounding_metadata.web_search_queries
+        if web_search_queries:
+            web_search_queries_used = (
+                web_search_queries
+                if isinstance(web_search_queries, list)
+                else list(web_search_queries)
             )
 
+    # The outputs are built from SDK data we control, so pydantic validation is skipped
     if include_citations:
-        return {
-            "text": response.text,
-            "web_search_queries": web_search_queries_used,
-            "citations": structured_citations,
-        }
+        return WebSearchToolOutput.model_construct(
+            text=response.text,
+            web_search_queries=web_search_queries_used,
+            citations=structured_citations,
+        )
     else:
-        return {
-            "text": response.text,
-        }
+        return TextToolOutput.model_construct(text=response.text)
 
 
+@tool
 async def use_gemini(
     prompt: Annotated[
         str,
@@ -126,6 +158,4 @@ async def use_gemini(
         contents=prompt,
     )
 
-    return {
-        "text": response.text,
-    }
+    return TextToolOutput.model_construct(text=response.text)
@@ -1,17 +1,36 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Any
+from collections import OrderedDict
+from functools import lru_cache
 import datetime
 import os
+import ssl
+import time
+import certifi
+import httpx
 from fastmcp.server.dependencies import get_http_request
 from starlette.requests import Request
 
 
+# Gemini clients keyed by API key, so connection pools are reused across tool calls.
+# Bounded because in streamable-http mode every distinct bearer token adds an entry.
+_CLIENT_CACHE_MAXSIZE = 128
+_CLIENT_CACHE: "OrderedDict[str, Any]" = OrderedDict()
+
+# [expires_at, date_str] - the date string is valid until the next local midnight.
+_DATE_CACHE: List[Any] = [0.0, ""]
+
+
 class Source(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     title: str
     uri: str
 
 
 class CitationEntry(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     text: str
     start_index: int
     end_index: int
@@ -19,23 +38,35 @@ class CitationEntry(BaseModel):
 
 
 class WebSearchToolOutput(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     text: str
     web_search_queries: List[str]
     citations: List[CitationEntry]
 
 
 class TextToolOutput(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     text: str
 
 
 def get_current_date() -> str:
     """Returns the current date as a string in YYYY-MM-DD format."""
-    return datetime.datetime.now().strftime("%Y-%m-%d")
+    now = time.time()
+    if now >= _DATE_CACHE[0]:
+        today = datetime.date.fromtimestamp(now)
+        next_midnight = datetime.datetime.combine(
+            today + datetime.timedelta(days=1), datetime.time()
+        )
+        _DATE_CACHE[0] = next_midnight.timestamp()
+        _DATE_CACHE[1] = today.strftime("%Y-%m-%d")
+    return _DATE_CACHE[1]
 
 
 def process_grounding_to_structured_citations(
     grounding_metadata: Any,
-):
+) -> List[CitationEntry]:
     """
     Processes grounding metadata from the Gemini API response to produce a list
     of structured CitationEntry objects.
@@ -46,30 +77,139 @@ def process_grounding_to_structured_citations(
         return []
 
     # Return empty citations if grounding_supports attribute doesn't exist or is None/empty
-    if (
-        not hasattr(grounding_metadata, "grounding_supports")
-        or not grounding_metadata.grounding_supports
-    ):
+    supports = getattr(grounding_metadata, "grounding_supports", None)
+    if not supports:
         return []
 
-    citations = []
-    for support in grounding_metadata.grounding_supports:
-        obj = {
-            "text": support.segment.text,
-            "start_index": (
-                support.segment.start_index if support.segment.start_index else 0
-            ),
-            "end_index": support.segment.end_index,
-            "sources": [
-                {
-                    "title": grounding_metadata.grounding_chunks[idx].web.title,
-                    "uri": grounding_metadata.grounding_chunks[idx].web.uri,
-                }
+    # Resolve each chunk's source once, then index into them per support; the models
+    # are frozen, so one Source can be shared. Chunks without web data have no title
+    # or uri, so they are left out of sources.
+    # Built with model_construct since the values come straight from the SDK response.
+    sources = [
+        Source.model_construct(title=chunk.web.title, uri=chunk.web.uri)
+        if chunk.web
+        else None
+        for chunk in grounding_metadata.grounding_chunks
+    ]
+    return [
+        CitationEntry.model_construct(
+            text=support.segment.text,
+            start_index=support.segment.start_index or 0,
+            end_index=support.segment.end_index,
+            sources=[
+                sources[idx]
                 for idx in support.grounding_chunk_indices
+                if sources[idx] is not None
             ],
+        )
+        for support in supports
+    ]
+
+
+@lru_cache(maxsize=1)
+def _get_http_options():
+    """
+    HTTP options shared by every Gemini client: HTTP/2 with keep-alive pool limits, and
+    one SSL context so creating a client does not reload the CA bundle each time.
+    """
+    from google.genai.types import HttpOptions
+
+    # Same defaults google-genai uses when no SSL context is provided
+    ssl_context = ssl.create_default_context(
+        cafile=os.environ.get("SSL_CERT_FILE", certifi.where()),
+        capath=os.environ.get("SSL_CERT_DIR"),
+    )
+    return HttpOptions(
+        async_client_args={
+            "http2": True,
+            "limits": httpx.Limits(max_connections=200, max_keepalive_connections=50),
+            "verify": ssl_context,
         }
-        citations.append(obj)
-    return citations
+    )
+
+
+def _get_cached_client(api_key: str):
+    """Returns the Gemini client for the given API key, creating it on first use."""
+    genai_client = _CLIENT_CACHE.get(api_key)
+    if genai_client is not None:
+        _CLIENT_CACHE.move_to_end(api_key)
+        return genai_client
+
+    try:
+        from google.genai import Client
+    except ImportError:
+        raise ImportError("google-genai library not found. Please install it.")
+
+    # No await between the lookup and the insert, so concurrent tool calls cannot race here.
+    genai_client = Client(api_key=api_key, http_options=_get_http_options())
+    _CLIENT_CACHE[api_key] = genai_client
+    if len(_CLIENT_CACHE) > _CLIENT_CACHE_MAXSIZE:
+        _CLIENT_CACHE.popitem(last=False)
+    return genai_client
+
+
+def reset_gemini_client():
+    """Drop all cached Gemini clients, e.g. to release connections after a key rotation."""
+    _CLIENT_CACHE.clear()
+
+
+def _get_stdio_client():
+    """Returns the Gemini client for the GEMINI_API_KEY environment variable."""
+    api_key_to_use = os.getenv("GEMINI_API_KEY")
+    if not api_key_to_use:
+        raise ValueError(
+            "Authentication failed. GEMINI_API_KEY not found for stdio mode."
+        )
+    return _get_cached_client(api_key_to_use)
+
+
+def _get_http_client():
+    """Returns the Gemini client for the bearer token of the current HTTP request."""
+    try:
+        request_starlette: Request = get_http_request()
+    except RuntimeError:
+        raise ValueError(
+            "Tool must be called via an HTTP request for streamable-http mode."
+        )
+
+    # Already resolved by an earlier tool call within this request
+    genai_client = getattr(request_starlette.state, "gemini_client", None)
+    if genai_client is not None:
+        return genai_client
+
+    bearer_token = getattr(request_starlette.state, "bearer_token", None)
+    if not bearer_token:
+        raise ValueError(
+            "Authentication failed in streamable-http mode. Bearer token not found."
+        )
+
+    genai_client = _get_cached_client(bearer_token)
+    request_starlette.state.gemini_client = genai_client
+    return genai_client
+
+
+def _get_client_for_invalid_mode():
+    raise ValueError(f"Invalid MCP_TRANSPORT_MODE: {_TRANSPORT_MODE}")
+
+
+_CLIENT_GETTERS = {
+    "stdio": _get_stdio_client,
+    "streamable-http": _get_http_client,
+}
+
+
+def refresh_transport_mode():
+    """
+    Re-reads MCP_TRANSPORT_MODE and selects how get_gemini_client authenticates.
+    Must be called whenever the environment variable changes after import.
+    """
+    global _TRANSPORT_MODE, _get_client
+    # Default to streamable-http if not set
+    _TRANSPORT_MODE = os.getenv("MCP_TRANSPORT_MODE", "streamable-http")
+    _get_client = _CLIENT_GETTERS.get(_TRANSPORT_MODE, _get_client_for_invalid_mode)
+
+
+refresh_transport_mode()
 
 
 async def get_gemini_client():
@@ -77,51 +217,10 @@ async def get_gemini_client():
     Handles authentication for Gemini client based on transport mode.
 
     Returns:
-        tuple: (Client, api_key_to_use) - The authenticated Gemini client and the API key used
+        Client: The authenticated Gemini client, shared by all calls using the same API key
 
     Raises:
         ValueError: If authentication fails or transport mode is invalid
         ImportError: If google.genai library is not found
     """
-    transport_mode = os.getenv(
-        "MCP_TRANSPORT_MODE", "streamable-http"
-    )  # Default to streamable-http if not set
-    api_key_to_use = None
-
-    if transport_mode == "stdio":
-        api_key_to_use = os.getenv("GEMINI_API_KEY")
-        if not api_key_to_use:
-            raise ValueError(
-                "Authentication failed. GEMINI_API_KEY not found for stdio mode."
-            )
-
-    elif transport_mode == "streamable-http":
-        try:
-            request_starlette: Request = get_http_request()
-        except RuntimeError:
-            raise ValueError(
-                "Tool must be called via an HTTP request for streamable-http mode."
-            )
-
-        bearer_token = getattr(request_starlette.state, "bearer_token", None)
-        if not bearer_token:
-            raise ValueError(
-                "Authentication failed in streamable-http mode. Bearer token not found."
-            )
-
-        api_key_to_use = bearer_token
-
-    else:
-        raise ValueError(f"Invalid MCP_TRANSPORT_MODE: {transport_mode}")
-
-    # Ensure api_key_to_use is set by one of the branches
-    if not api_key_to_use:
-        raise ValueError("Critical: API key for Gemini client is missing.")
-
-    try:
-        from google.genai import Client
-    except ImportError:
-        raise ImportError("google-genai library not found. Please install it.")
-
-    genai_client = Client(api_key=api_key_to_use)
-    return genai_client
+    return _get_client()
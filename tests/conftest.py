@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from gemini_mcp.config import ModelConfig, clear_config_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_config_cache():
+    """Start and finish every test with an empty configuration cache."""
+    clear_config_cache()
+    yield
+    clear_config_cache()
+
+
+@pytest.fixture
+def frozen_config(request, monkeypatch):
+    """
+    Pin get_config to one ModelConfig without reading the environment.
+
+    Defaults to the built-in models; parametrize indirectly with a dict of fields to
+    override, e.g. {"web_search_model": "gemini-2.5-pro"}.
+    """
+    config = ModelConfig(**getattr(request, "param", {}))
+    monkeypatch.setattr("gemini_mcp.config.get_config", lambda: config)
+    return config
+
+
+@pytest.fixture
+def gemini_mock(monkeypatch):
+    """
+    Patch the tools' Gemini client with a pre-wired mock.
+
+    Yields (client, response): generate_content returns the response, which has no
+    grounding metadata. Tests override only the fields they care about.
+    """
+    response = SimpleNamespace(
+        text=None, candidates=[SimpleNamespace(grounding_metadata=None)]
+    )
+    client = AsyncMock()
+    client.aio.models.generate_content = AsyncMock(return_value=response)
+    monkeypatch.setattr(
+        "gemini_mcp.tools.get_gemini_client", AsyncMock(return_value=client)
+    )
+    yield client, response
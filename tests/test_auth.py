@@ -0,0 +1,136 @@
+from unittest.mock import patch
+
+import pytest
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from gemini_mcp import auth
+from gemini_mcp.auth import BearerTokenAuthMiddleware
+
+
+async def echo_token(request: Request):
+    return PlainTextResponse(getattr(request.state, "bearer_token", ""))
+
+
+@pytest.fixture
+def client():
+    app = Starlette(
+        routes=[Route("/", echo_token), Route("/mcp", echo_token)],
+        middleware=[Middleware(BearerTokenAuthMiddleware)],
+    )
+    return TestClient(app)
+
+
+def test_root_path_skips_auth(client):
+    response = client.get("/")
+    assert response.status_code == 200
+
+
+def test_missing_header(client):
+    response = client.get("/mcp")
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Authorization header missing"}
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "AIzaToken",
+        "Basic AIzaToken",
+        "Bearer AIza Token",
+        "Bearer",
+        "Bearer ",
+        "BearerAIzaToken",
+        "Bearers AIzaToken",
+    ],
+)
+def test_invalid_header_format(client, header):
+    response = client.get("/mcp", headers={"Authorization": header})
+    assert response.status_code == 401
+    assert response.json() == {
+        "detail": "Invalid Authorization header. Must be 'Bearer <token>'"
+    }
+
+
+def test_error_responses_are_not_shared(client):
+    response1 = client.get("/mcp")
+    response2 = client.get("/mcp")
+    assert response1.headers["content-type"] == "application/json"
+    assert response1.headers["content-length"] == response2.headers["content-length"]
+
+
+def test_invalid_token(client):
+    response = client.get("/mcp", headers={"Authorization": "Bearer sk-token"})
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid token. Must be a AI Studio token"}
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        "Bearer AIzaToken",
+        "bearer AIzaToken",
+        "BEARER AIzaToken",
+        "BeArEr AIzaToken",
+        "Bearer\tAIzaToken",
+        "Bearer   AIzaToken",
+    ],
+)
+def test_valid_token(client, header):
+    response = client.get("/mcp", headers={"Authorization": header})
+    assert response.status_code == 200
+    assert response.text == "AIzaToken"
+
+
+@pytest.mark.parametrize("whitespace", ["\xa0", "\x0b", "\x0c"])
+def test_header_whitespace_matches_str_split(whitespace):
+    # Any whitespace separates or surrounds the token, as with str.split()
+    for header in (
+        f"Bearer AIzaToken{whitespace}",
+        f"Bearer{whitespace}AIzaToken",
+        f"Bearer {whitespace}AIzaToken",
+    ):
+        assert auth._validate_auth_header(header) == ("AIzaToken", None)
+
+    assert auth._validate_auth_header(f"Bearer AIza{whitespace}Token") == (
+        None,
+        "Invalid Authorization header. Must be 'Bearer <token>'",
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    auth._TOKEN_CACHE.clear()
+    yield
+    auth._TOKEN_CACHE.clear()
+
+
+def test_validation_is_cached(client):
+    with patch.object(
+        auth, "_validate_auth_header", wraps=auth._validate_auth_header
+    ) as mock_validate:
+        for _ in range(3):
+            client.get("/mcp", headers={"Authorization": "Bearer AIzaToken"})
+
+    mock_validate.assert_called_once_with("Bearer AIzaToken")
+    assert auth._TOKEN_CACHE == {"Bearer AIzaToken": "AIzaToken"}
+
+
+@pytest.mark.parametrize(
+    "header", ["Bearer invalid", "Basic AIzaToken", "Bearer AI" + "x" * 300]
+)
+def test_only_short_valid_headers_are_cached(client, header):
+    client.get("/mcp", headers={"Authorization": header})
+    assert not auth._TOKEN_CACHE
+
+
+def test_token_cache_is_bounded(client, monkeypatch):
+    monkeypatch.setattr(auth, "_TOKEN_CACHE_MAXSIZE", 2)
+    for i in range(3):
+        client.get("/mcp", headers={"Authorization": f"Bearer AIzaToken{i}"})
+
+    assert list(auth._TOKEN_CACHE) == ["Bearer AIzaToken1", "Bearer AIzaToken2"]
@@ -1,8 +1,10 @@
+import re
 import pytest
-import os
+from collections.abc import Mapping
 from unittest.mock import patch
 from gemini_mcp.config import (
     ModelConfig,
+    clear_config_cache,
     get_config,
     get_model_for_web_search,
     get_default_model,
@@ -10,31 +12,43 @@ from gemini_mcp.config import (
     get_all_models,
 )
 
+_ERR_RE = re.compile(r"Invalid model format: (.*)\. Must start with 'gemini-'")
+
+
+def _count_custom_calls(mock_logger):
+    """Count the "Using custom ..." info messages logged by get_config."""
+    return sum(
+        1
+        for c in mock_logger.info.call_args_list
+        if c.args and c.args[0].startswith("Using custom")
+    )
+
 
 class TestModelConfig:
     """Test cases for ModelConfig validation logic."""
 
-    def test_valid_model_names(self):
-        """Test that valid model names are accepted."""
-        valid_models = [
+    @pytest.mark.parametrize(
+        "model",
+        [
             "gemini-flash-latest",
             "gemini-flash-lite-latest",
             "gemini-2.5-pro",
             "gemini-2.5-flash",
             "gemini-2.5-flash-lite",
-        ]
-
-        for model in valid_models:
-            config = ModelConfig(
-                web_search_model=model, default_model=model, advanced_model=model
-            )
-            assert config.web_search_model == model
-            assert config.default_model == model
-            assert config.advanced_model == model
+        ],
+    )
+    def test_valid_model_names(self, model):
+        """Test that valid model names are accepted."""
+        config = ModelConfig(
+            web_search_model=model, default_model=model, advanced_model=model
+        )
+        assert config.web_search_model == model
+        assert config.default_model == model
+        assert config.advanced_model == model
 
-    def test_invalid_model_names(self):
-        """Test that invalid model names raise ValueError."""
-        invalid_models = [
+    @pytest.mark.parametrize(
+        "model",
+        [
             "2.0-flash",
             "gpt-4",
             "claude-3",
@@ -42,42 +56,37 @@ class TestModelConfig:
             "",
             "gemini",
             "Gemini-flash-latest",  # Capital G
-        ]
-
-        for model in invalid_models:
-            with pytest.raises(
-                ValueError,
-                match=f"Invalid model format: {model}. Must start with 'gemini-'",
-            ):
-                ModelConfig(
-                    web_search_model=model, default_model=model, advanced_model=model
-                )
+        ],
+    )
+    def test_invalid_model_names(self, model):
+        """Test that invalid model names raise ValueError."""
+        with pytest.raises(ValueError, match=_ERR_RE) as exc_info:
+            ModelConfig(
+                web_search_model=model, default_model=model, advanced_model=model
+            )
+        assert _ERR_RE.match(str(exc_info.value)).group(1) == model
 
     def test_mixed_valid_invalid_models(self):
         """Test configuration with mixed valid and invalid models."""
         # Valid web_search and default, but invalid advanced
-        with pytest.raises(
-            ValueError,
-            match="Invalid model format: invalid-model. Must start with 'gemini-'",
-        ):
+        with pytest.raises(ValueError, match=_ERR_RE) as exc_info:
             ModelConfig(
                 web_search_model="gemini-flash-latest",
                 default_model="gemini-2.5-pro",
                 advanced_model="invalid-model",
             )
+        assert _ERR_RE.match(str(exc_info.value)).group(1) == "invalid-model"
 
     def test_partial_validation(self):
         """Test that validation stops at first error."""
         # This should fail on web_search_model validation
-        with pytest.raises(
-            ValueError,
-            match="Invalid model format: bad-model. Must start with 'gemini-'",
-        ):
+        with pytest.raises(ValueError, match=_ERR_RE) as exc_info:
             ModelConfig(
                 web_search_model="bad-model",
                 default_model="gemini-flash-latest",
                 advanced_model="gemini-2.5-pro",
             )
+        assert _ERR_RE.match(str(exc_info.value)).group(1) == "bad-model"
 
     def test_default_values(self):
         """Test that default values are applied when not specified."""
@@ -97,23 +106,13 @@ class TestModelConfig:
 class TestEnvironmentVariableParsing:
     """Test cases for environment variable parsing."""
 
-    def setup_method(self):
-        """Save original environment variables."""
-        self.original_env = os.environ.copy()
-
-    def teardown_method(self):
-        """Restore original environment variables."""
-        os.environ.clear()
-        os.environ.update(self.original_env)
-        # Clear the cache after each test
-        get_config.cache_clear()
-
     @patch("gemini_mcp.config.logger")
-    def test_valid_environment_variables(self, mock_logger):
+    def test_valid_environment_variables(self, mock_logger, monkeypatch):
         """Test parsing with valid environment variables."""
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "gemini-2.5-pro"
-        os.environ["GEMINI_DEFAULT_MODEL"] = "gemini-1.5-pro"  # Different from default
-        os.environ["GEMINI_ADVANCED_MODEL"] = "gemini-2.5-pro"
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-2.5-pro")
+        # Different from default
+        monkeypatch.setenv("GEMINI_DEFAULT_MODEL", "gemini-1.5-pro")
+        monkeypatch.setenv("GEMINI_ADVANCED_MODEL", "gemini-2.5-pro")
 
         config = get_config()
 
@@ -121,31 +120,21 @@ class TestEnvironmentVariableParsing:
         assert config.default_model == "gemini-1.5-pro"
         assert config.advanced_model == "gemini-2.5-pro"
 
-        # Check that logger was called for custom values
-        custom_calls = [
-            call
-            for call in mock_logger.info.call_args_list
-            if "Using custom" in str(call)
-        ]
-
         # Should have 2 custom calls (web_search and default are different from defaults)
-        assert len(custom_calls) == 2
+        assert _count_custom_calls(mock_logger) == 2
 
         # Check each custom call
-        custom_values = [call[0][0] for call in custom_calls]
-        assert any(
-            "Using custom GEMINI_WEB_SEARCH_MODEL: gemini-2.5-pro" in call
-            for call in custom_values
+        mock_logger.info.assert_any_call(
+            "Using custom GEMINI_WEB_SEARCH_MODEL: gemini-2.5-pro"
         )
-        assert any(
-            "Using custom GEMINI_DEFAULT_MODEL: gemini-1.5-pro" in call
-            for call in custom_values
+        mock_logger.info.assert_any_call(
+            "Using custom GEMINI_DEFAULT_MODEL: gemini-1.5-pro"
         )
 
     @patch("gemini_mcp.config.logger")
-    def test_partial_environment_variables(self, mock_logger):
+    def test_partial_environment_variables(self, mock_logger, monkeypatch):
         """Test parsing with partial environment variables."""
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "gemini-2.5-pro"
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-2.5-pro")
         # Don't set default and advanced - should use defaults
 
         config = get_config()
@@ -155,19 +144,13 @@ class TestEnvironmentVariableParsing:
         assert config.advanced_model == "gemini-2.5-pro"  # Default
 
         # Check that logger was called only for the custom value
-        custom_calls = [
-            call
-            for call in mock_logger.info.call_args_list
-            if "Using custom" in str(call)
-        ]
-        assert len(custom_calls) == 1
-        assert (
-            custom_calls[0][0][0]
-            == "Using custom GEMINI_WEB_SEARCH_MODEL: gemini-2.5-pro"
+        assert _count_custom_calls(mock_logger) == 1
+        mock_logger.info.assert_any_call(
+            "Using custom GEMINI_WEB_SEARCH_MODEL: gemini-2.5-pro"
         )
 
     @patch("gemini_mcp.config.logger")
-    def test_no_environment_variables(self, mock_logger):
+    def test_no_environment_variables(self, mock_logger, monkeypatch):
         """Test parsing with no environment variables (all defaults)."""
         # Ensure no env vars are set
         for key in [
@@ -175,8 +158,7 @@ class TestEnvironmentVariableParsing:
             "GEMINI_DEFAULT_MODEL",
             "GEMINI_ADVANCED_MODEL",
         ]:
-            if key in os.environ:
-                del os.environ[key]
+            monkeypatch.delenv(key, raising=False)
 
         config = get_config()
 
@@ -185,19 +167,14 @@ class TestEnvironmentVariableParsing:
         assert config.advanced_model == "gemini-2.5-pro"
 
         # Check that logger was not called for custom values
-        custom_calls = [
-            call
-            for call in mock_logger.info.call_args_list
-            if "Using custom" in str(call)
-        ]
-        assert len(custom_calls) == 0
+        assert _count_custom_calls(mock_logger) == 0
 
     @patch("gemini_mcp.config.logger")
-    def test_invalid_environment_variables(self, mock_logger):
+    def test_invalid_environment_variables(self, mock_logger, monkeypatch):
         """Test parsing with invalid environment variables."""
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "invalid-model"
-        os.environ["GEMINI_DEFAULT_MODEL"] = "gemini-flash-latest"
-        os.environ["GEMINI_ADVANCED_MODEL"] = "gemini-2.5-pro"
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "invalid-model")
+        monkeypatch.setenv("GEMINI_DEFAULT_MODEL", "gemini-flash-latest")
+        monkeypatch.setenv("GEMINI_ADVANCED_MODEL", "gemini-2.5-pro")
 
         config = get_config()
 
@@ -216,41 +193,37 @@ class TestEnvironmentVariableParsing:
 class TestDefaultFallbackBehavior:
     """Test cases for default fallback behavior."""
 
-    def setup_method(self):
-        """Save original environment variables."""
-        self.original_env = os.environ.copy()
-
-    def teardown_method(self):
-        """Restore original environment variables."""
-        os.environ.clear()
-        os.environ.update(self.original_env)
-        # Clear the cache after each test
-        get_config.cache_clear()
-
+    @pytest.mark.parametrize(
+        "env,expected_invalid",
+        [
+            ({"GEMINI_WEB_SEARCH_MODEL": "invalid-model"}, "invalid-model"),
+            ({"GEMINI_DEFAULT_MODEL": "invalid-default"}, "invalid-default"),
+            ({"GEMINI_ADVANCED_MODEL": "invalid-advanced"}, "invalid-advanced"),
+            (
+                {
+                    "GEMINI_WEB_SEARCH_MODEL": "invalid-web",
+                    "GEMINI_DEFAULT_MODEL": "invalid-default",
+                    "GEMINI_ADVANCED_MODEL": "invalid-advanced",
+                },
+                "invalid-web",
+            ),
+            (
+                {
+                    "GEMINI_WEB_SEARCH_MODEL": "invalid-model",
+                    "GEMINI_DEFAULT_MODEL": "another-invalid-model",
+                    "GEMINI_ADVANCED_MODEL": "yet-another-invalid-model",
+                },
+                "invalid-model",
+            ),
+        ],
+    )
     @patch("gemini_mcp.config.logger")
-    def test_fallback_to_defaults_on_error(self, mock_logger):
+    def test_fallback_to_defaults_on_error(
+        self, mock_logger, monkeypatch, env, expected_invalid
+    ):
         """Test that defaults are used when environment variables cause errors."""
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "invalid-model"
-
-        config = get_config()
-
-        # Should use defaults
-        assert config.web_search_model == "gemini-flash-latest"
-        assert config.default_model == "gemini-flash-lite-latest"
-        assert config.advanced_model == "gemini-2.5-pro"
-
-        # Check warning was logged
-        mock_logger.warning.assert_called()
-        warning_message = mock_logger.warning.call_args[0][0]
-        assert "Error loading configuration" in warning_message
-        assert "Invalid model format: invalid-model" in warning_message
-
-    @patch("gemini_mcp.config.logger")
-    def test_fallback_with_multiple_errors(self, mock_logger):
-        """Test fallback when multiple environment variables are invalid."""
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "invalid-web"
-        os.environ["GEMINI_DEFAULT_MODEL"] = "invalid-default"
-        os.environ["GEMINI_ADVANCED_MODEL"] = "invalid-advanced"
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
 
         config = get_config()
 
@@ -259,11 +232,11 @@ class TestDefaultFallbackBehavior:
         assert config.default_model == "gemini-flash-lite-latest"
         assert config.advanced_model == "gemini-2.5-pro"
 
-        # Check warning was logged
+        # Check warning was logged for the first invalid field
         mock_logger.warning.assert_called()
         warning_message = mock_logger.warning.call_args[0][0]
         assert "Error loading configuration" in warning_message
-        assert "Invalid model format: invalid-web" in warning_message
+        assert f"Invalid model format: {expected_invalid}." in warning_message
 
 
 class TestErrorHandlingAndWarningLogging:
@@ -272,15 +245,13 @@ class TestErrorHandlingAndWarningLogging:
     @patch("gemini_mcp.config.logger")
     def test_warning_for_invalid_model_format(self, mock_logger):
         """Test that warnings are logged for invalid model formats."""
-        with pytest.raises(
-            ValueError,
-            match="Invalid model format: bad-model. Must start with 'gemini-'",
-        ):
+        with pytest.raises(ValueError, match=_ERR_RE) as exc_info:
             ModelConfig(
                 web_search_model="bad-model",
                 default_model="gemini-flash-latest",
                 advanced_model="gemini-2.5-pro",
             )
+        assert _ERR_RE.match(str(exc_info.value)).group(1) == "bad-model"
 
         # Check warning was logged
         mock_logger.warning.assert_called_with(
@@ -298,28 +269,16 @@ class TestErrorHandlingAndWarningLogging:
             )
 
         # Check warnings were logged for each invalid model
-        warning_calls = [call[0][0] for call in mock_logger.warning.call_args_list]
-        assert any(
-            "Invalid web search model format: bad-web" in call for call in warning_calls
-        )
-        assert any(
-            "Invalid default model format: bad-default" in call
-            for call in warning_calls
-        )
-        assert any(
-            "Invalid advanced model format: bad-advanced" in call
-            for call in warning_calls
+        mock_logger.warning.assert_any_call("Invalid web search model format: bad-web")
+        mock_logger.warning.assert_any_call("Invalid default model format: bad-default")
+        mock_logger.warning.assert_any_call(
+            "Invalid advanced model format: bad-advanced"
         )
 
 
 class TestConfigurationCaching:
     """Test cases for configuration caching mechanism."""
 
-    def setup_method(self):
-        """Clear cache before each test."""
-        # Clear the LRU cache
-        get_config.cache_clear()
-
     def test_caching_behavior(self):
         """Test that configuration is cached properly."""
         # First call should create and cache the config
@@ -331,22 +290,26 @@ class TestConfigurationCaching:
         # Should be the same object (cached)
         assert config1 is config2
 
-    def test_cache_with_environment_variables(self):
+    def test_cache_with_environment_variables(self, monkeypatch):
         """Test that cache respects environment variables."""
         # Set environment variable
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "gemini-2.5-pro"
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-2.5-pro")
 
         # First call should cache the config with the env var value
         config1 = get_config()
         assert config1.web_search_model == "gemini-2.5-pro"
 
         # Change environment variable
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "gemini-flash-latest"
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-flash-latest")
 
-        # Second call should still return cached config (old value)
+        # Second call should pick up the new value without clearing the cache
         config2 = get_config()
-        assert config2.web_search_model == "gemini-2.5-pro"
-        assert config1 is config2
+        assert config2.web_search_model == "gemini-flash-latest"
+        assert config1 is not config2
+
+        # Switching back should return the config cached for those values
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-2.5-pro")
+        assert get_config() is config1
 
     def test_cache_clear(self):
         """Test that cache can be cleared."""
@@ -354,7 +317,7 @@ class TestConfigurationCaching:
         config1 = get_config()
 
         # Clear cache
-        get_config.cache_clear()
+        clear_config_cache()
 
         # Get config again - should be a new object
         config2 = get_config()
@@ -364,51 +327,38 @@ class TestConfigurationCaching:
 class TestConfigurationReload:
     """Test cases for configuration reload functionality."""
 
-    def setup_method(self):
-        """Clear cache and save original environment."""
-        get_config.cache_clear()
-        self.original_env = os.environ.copy()
-
-    def teardown_method(self):
-        """Restore original environment."""
-        os.environ.clear()
-        os.environ.update(self.original_env)
-        get_config.cache_clear()
-
-    def test_reload_with_changed_environment(self):
+    def test_reload_with_changed_environment(self, monkeypatch):
         """Test reloading configuration with changed environment variables."""
         # Set initial environment
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "gemini-2.5-pro"
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-2.5-pro")
 
         # Get initial config
         config1 = get_config()
         assert config1.web_search_model == "gemini-2.5-pro"
 
         # Change environment
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "gemini-flash-latest"
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-flash-latest")
 
-        # Clear cache and get new config
-        get_config.cache_clear()
+        # Get new config - the changed environment alone is picked up
         config2 = get_config()
 
         # Should have new value
         assert config2.web_search_model == "gemini-flash-latest"
         assert config1 is not config2
 
-    def test_reload_with_invalid_environment(self):
+    def test_reload_with_invalid_environment(self, monkeypatch):
         """Test reloading configuration with invalid environment variables."""
         # Set valid initial environment
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "gemini-2.5-pro"
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-2.5-pro")
 
         # Get initial config
         config1 = get_config()
         assert config1.web_search_model == "gemini-2.5-pro"
 
         # Set invalid environment
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "invalid-model"
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "invalid-model")
 
-        # Clear cache and get new config - should fall back to defaults
-        get_config.cache_clear()
+        # Get new config - should fall back to defaults
         config2 = get_config()
 
         # Should have default value
@@ -419,50 +369,43 @@ class TestConfigurationReload:
 class TestUtilityFunctions:
     """Test cases for utility functions that use the configuration."""
 
-    def setup_method(self):
-        """Clear cache before each test."""
-        get_config.cache_clear()
-
-    def test_get_model_for_web_search(self):
+    def test_get_model_for_web_search(self, monkeypatch):
         """Test get_model_for_web_search function."""
         # Test with default config
         model = get_model_for_web_search()
         assert model == "gemini-flash-latest"
 
         # Test with custom config via environment
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "gemini-2.5-pro"
-        get_config.cache_clear()
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-2.5-pro")
 
         model = get_model_for_web_search()
         assert model == "gemini-2.5-pro"
 
-    def test_get_default_model(self):
+    def test_get_default_model(self, monkeypatch):
         """Test get_default_model function."""
         # Test with default config
         model = get_default_model()
         assert model == "gemini-flash-lite-latest"
 
         # Test with custom config via environment
-        os.environ["GEMINI_DEFAULT_MODEL"] = "gemini-2.5-pro"
-        get_config.cache_clear()
+        monkeypatch.setenv("GEMINI_DEFAULT_MODEL", "gemini-2.5-pro")
 
         model = get_default_model()
         assert model == "gemini-2.5-pro"
 
-    def test_get_advanced_model(self):
+    def test_get_advanced_model(self, monkeypatch):
         """Test get_advanced_model function."""
         # Test with default config
         model = get_advanced_model()
         assert model == "gemini-2.5-pro"
 
         # Test with custom config via environment
-        os.environ["GEMINI_ADVANCED_MODEL"] = "gemini-flash-latest"
-        get_config.cache_clear()
+        monkeypatch.setenv("GEMINI_ADVANCED_MODEL", "gemini-flash-latest")
 
         model = get_advanced_model()
         assert model == "gemini-flash-latest"
 
-    def test_get_all_models(self):
+    def test_get_all_models(self, monkeypatch):
         """Test get_all_models function."""
         # Clear any existing environment variables
         for key in [
@@ -470,15 +413,11 @@ class TestUtilityFunctions:
             "GEMINI_DEFAULT_MODEL",
             "GEMINI_ADVANCED_MODEL",
         ]:
-            if key in os.environ:
-                del os.environ[key]
-
-        # Clear cache to ensure we get fresh config
-        get_config.cache_clear()
+            monkeypatch.delenv(key, raising=False)
 
         models = get_all_models()
 
-        assert isinstance(models, dict)
+        assert isinstance(models, Mapping)
         assert "web_search" in models
         assert "default" in models
         assert "advanced" in models
@@ -489,12 +428,34 @@ class TestUtilityFunctions:
         assert models["advanced"] == "gemini-2.5-pro"
 
         # Test with custom environment
-        os.environ["GEMINI_WEB_SEARCH_MODEL"] = "gemini-2.5-pro"
-        os.environ["GEMINI_DEFAULT_MODEL"] = "gemini-flash-lite-latest"
-        os.environ["GEMINI_ADVANCED_MODEL"] = "gemini-2.5-pro"
-        get_config.cache_clear()
+        monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-2.5-pro")
+        monkeypatch.setenv("GEMINI_DEFAULT_MODEL", "gemini-flash-lite-latest")
+        monkeypatch.setenv("GEMINI_ADVANCED_MODEL", "gemini-2.5-pro")
 
         models = get_all_models()
         assert models["web_search"] == "gemini-2.5-pro"
         assert models["default"] == "gemini-flash-lite-latest"
         assert models["advanced"] == "gemini-2.5-pro"
+
+    def test_get_all_models_is_cached_and_read_only(self):
+        """Test that get_all_models returns the same read-only mapping per config."""
+        models1 = get_all_models()
+        models2 = get_all_models()
+        assert models1 is models2
+
+        with pytest.raises(TypeError):
+            models1["default"] = "gemini-2.5-pro"
+
+    def test_get_all_models_defaults_shared(self, monkeypatch):
+        """Test that the default configuration always maps to the same object."""
+        for key in [
+            "GEMINI_WEB_SEARCH_MODEL",
+            "GEMINI_DEFAULT_MODEL",
+            "GEMINI_ADVANCED_MODEL",
+        ]:
+            monkeypatch.delenv(key, raising=False)
+        models1 = get_all_models()
+
+        # Explicitly setting a default value yields the same mapping
+        monkeypatch.setenv("GEMINI_DEFAULT_MODEL", "gemini-flash-lite-latest")
+        assert get_all_models() is models1
@@ -1,7 +1,7 @@
 import pytest
 from fastmcp import FastMCP, Client
 from gemini_mcp.server import mcp as gemini_mcp_server
-import os
+from gemini_mcp.utils import refresh_transport_mode
 
 
 @pytest.fixture(scope="module")
@@ -9,13 +9,16 @@ def mcp_stdio_server():
     """
     Fixture to provide the main gemini_mcp server instance for testing.
     """
-    # Set transport mode for testing
-    os.environ["MCP_TRANSPORT_MODE"] = "stdio"
+    # Set transport mode for testing, restoring the environment afterwards
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("MCP_TRANSPORT_MODE", "stdio")
+        refresh_transport_mode()
 
-    yield gemini_mcp_server
+        yield gemini_mcp_server
+
+    refresh_transport_mode()
 
 
-@pytest.mark.asyncio
 async def test_web_search_integration(mcp_stdio_server: FastMCP):
     """
     Tests the web_search tool using an in-memory client.
@@ -27,7 +30,6 @@ async def test_web_search_integration(mcp_stdio_server: FastMCP):
         assert len(result.content[0].text) > 0
 
 
-@pytest.mark.asyncio
 async def test_use_gemini_integration(mcp_stdio_server: FastMCP):
     """
     Tests the use_gemini tool using an in-memory client.
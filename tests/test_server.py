@@ -1,11 +1,30 @@
-from unittest.mock import MagicMock
-from gemini_mcp.server import mcp, main
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from gemini_mcp import utils
+from gemini_mcp.server import (
+    mcp,
+    main,
+    landing_page,
+    _new_event_loop,
+    _render_landing_page,
+)
+from starlette.requests import Request
+import asyncio
 import os
+import sys
 import pytest
 from fastmcp import Client
 
 
-@pytest.mark.asyncio
+@pytest.fixture(autouse=True)
+def restore_transport_mode(monkeypatch):
+    # main() writes MCP_TRANSPORT_MODE and re-selects how the Gemini client is resolved.
+    monkeypatch.setattr(utils, "_TRANSPORT_MODE", utils._TRANSPORT_MODE)
+    monkeypatch.setattr(utils, "_get_client", utils._get_client)
+    with patch.dict(os.environ):
+        yield
+
+
 async def test_tools_added():
     # Check if the tools from the tools module are added to the mcp instance
     async with Client(mcp) as client:
@@ -15,41 +34,169 @@ async def test_tools_added():
         assert "use_gemini" in tool_names
 
 
-def test_main_stdio(mocker):
-    # Mock argparse to return stdio transport
+async def test_only_registered_tools_added():
+    async with Client(mcp) as client:
+        tools = await client.list_tools()
+        tool_names = {tool.name for tool in tools}
+        assert tool_names == {"web_search", "use_gemini"}
+
+
+async def test_web_search_structured_output(mocker):
+    # Tool outputs are built with model_construct; check what clients receive
+    metadata = SimpleNamespace(
+        web_search_queries=["query1"],
+        grounding_chunks=[SimpleNamespace(web=SimpleNamespace(title="S1", uri="u1"))],
+        grounding_supports=[
+            SimpleNamespace(
+                segment=SimpleNamespace(text="claim", start_index=None, end_index=5),
+                grounding_chunk_indices=[0],
+            )
+        ],
+    )
+    mock_client = AsyncMock()
+    mock_client.aio.models.generate_content.return_value = SimpleNamespace(
+        text="result", candidates=[SimpleNamespace(grounding_metadata=metadata)]
+    )
+    mocker.patch(
+        "gemini_mcp.tools.get_gemini_client", AsyncMock(return_value=mock_client)
+    )
+
+    async with Client(mcp) as client:
+        result = await client.call_tool(
+            "web_search", {"query": "test query", "include_citations": True}
+        )
+
+    assert result.structured_content == {
+        "result": {
+            "text": "result",
+            "web_search_queries": ["query1"],
+            "citations": [
+                {
+                    "text": "claim",
+                    "start_index": 0,
+                    "end_index": 5,
+                    "sources": [{"title": "S1", "uri": "u1"}],
+                }
+            ],
+        }
+    }
+
+
+def _landing_request(headers):
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": "http",
+            "server": ("testserver", 80),
+            "path": "/",
+            "query_string": b"",
+            "headers": headers,
+        }
+    )
+
+
+async def test_landing_page():
+    response = await landing_page(_landing_request([(b"host", b"example.com:8000")]))
+    assert response.media_type == "text/html"
+    assert response.body.decode() == _render_landing_page(
+        "http://example.com:8000/mcp/"
+    )
+
+
+async def test_landing_page_forwarded_proto():
+    response = await landing_page(
+        _landing_request([(b"host", b"example.com"), (b"x-forwarded-proto", b"https")])
+    )
+    assert "Connect to: `https://example.com/mcp/`" in response.body.decode()
+
+
+async def test_landing_page_without_host_header():
+    response = await landing_page(_landing_request([]))
+    assert "Connect to: `http://testserver/mcp/`" in response.body.decode()
+
+
+def _mock_transport(mocker, transport):
     mock_args = MagicMock()
-    mock_args.transport = "stdio"
+    mock_args.transport = transport
     mock_parser = MagicMock()
     mock_parser.parse_args.return_value = mock_args
     mocker.patch("gemini_mcp.server.argparse.ArgumentParser", return_value=mock_parser)
-    mock_run = mocker.patch("gemini_mcp.server.mcp.run")
+
+
+def test_main_stdio(mocker):
+    # Mock argparse to return stdio transport
+    _mock_transport(mocker, "stdio")
+    mock_run = mocker.patch("gemini_mcp.server.mcp.run_async", new_callable=AsyncMock)
 
     # Call main
     main()
 
     # Assertions
-    mock_run.assert_called_once_with(transport="stdio")
+    mock_run.assert_awaited_once_with(transport="stdio")
     assert os.environ.get("MCP_TRANSPORT_MODE") == "stdio"
 
 
 def test_main_streamable_http(mocker):
     # Mock argparse to return streamable-http transport
-    mock_args = MagicMock()
-    mock_args.transport = "streamable-http"
-    mock_parser = MagicMock()
-    mock_parser.parse_args.return_value = mock_args
-    mocker.patch("gemini_mcp.server.argparse.ArgumentParser", return_value=mock_parser)
-    mock_run = mocker.patch("gemini_mcp.server.mcp.run")
+    _mock_transport(mocker, "streamable-http")
+    mock_run = mocker.patch("gemini_mcp.server.mcp.run_async", new_callable=AsyncMock)
 
     # Call main
     main()
 
     # Assertions
     assert os.environ.get("MCP_TRANSPORT_MODE") == "streamable-http"
-    mock_run.assert_called_once()
+    mock_run.assert_awaited_once()
     run_kwargs = mock_run.call_args.kwargs
     assert run_kwargs["transport"] == "streamable-http"
     assert run_kwargs["host"] == "0.0.0.0"
     assert run_kwargs["port"] == 8000
     assert run_kwargs["path"] == "/mcp"
     assert "middleware" in run_kwargs
+
+
+def test_main_runs_server_on_new_event_loop(mocker):
+    _mock_transport(mocker, "stdio")
+    loops = []
+
+    async def run_async(**kwargs):
+        loops.append(asyncio.get_running_loop())
+
+    mocker.patch("gemini_mcp.server.mcp.run_async", side_effect=run_async)
+    policy = asyncio.get_event_loop_policy()
+
+    # Call main
+    main()
+
+    # Assertions: the server loop comes from the factory, no global policy is set
+    assert asyncio.get_event_loop_policy() is policy
+    uvloop = pytest.importorskip("uvloop")
+    assert isinstance(loops[0], uvloop.Loop)
+
+
+def test_new_event_loop_task_factory():
+    started = []
+
+    async def child():
+        started.append(True)
+
+    async def spawn_child():
+        task = asyncio.get_running_loop().create_task(child())
+        ran_eagerly = bool(started)
+        await task
+        return asyncio.get_running_loop().get_task_factory(), ran_eagerly
+
+    loop = _new_event_loop()
+    try:
+        task_factory, ran_eagerly = loop.run_until_complete(spawn_child())
+    finally:
+        loop.close()
+
+    # Tasks start running inside create_task() on Python 3.12+
+    if sys.version_info >= (3, 12):
+        assert task_factory is not None
+        assert ran_eagerly
+    else:
+        assert task_factory is None
+        assert not ran_eagerly
@@ -1,157 +1,206 @@
 import pytest
-import os
-from unittest.mock import AsyncMock, patch
-from gemini_mcp.tools import web_search, use_gemini
-from gemini_mcp.config import get_config as get_config_cached
-
-
-# Existing tests remain unchanged
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-async def test_web_search_without_citations(mock_get_gemini_client):
-    # Mock the async client and its methods
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Test search result"
-    mock_response.candidates = [AsyncMock()]
-    mock_response.candidates[0].grounding_metadata = None
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, patch
+from gemini_mcp.tools import (
+    web_search,
+    use_gemini,
+    web_search_prompt,
+    _format_web_search_prompt,
+)
+from gemini_mcp.utils import (
+    CitationEntry,
+    Source,
+    TextToolOutput,
+    WebSearchToolOutput,
+    process_grounding_to_structured_citations,
+)
+
+# Expected prompt sent by web_search, kept separate from the production template
+WEB_SEARCH_PROMPT_TEMPLATE = (
+    'Conduct targeted Google Searches to gather the most recent, credible information on "{query}" and synthesize it into a verifiable text artifact.\n'
+    "\n"
+    "Instructions:\n"
+    "- Query should ensure that the most current information is gathered. The current date is {date}.\n"
+    "- Conduct multiple, diverse searches to gather comprehensive information.\n"
+    "- Consolidate key findings while meticulously tracking the source(s) for each specific piece of information.\n"
+    "- The output should be a well-written summary or report based on your search findings. \n"
+    "- Only include the information found in the search results, don't make up any information.\n"
+    "\n"
+    "Research Topic:\n"
+    "{query}\n"
+)
+
+
+def _citation(text, source):
+    return CitationEntry(
+        text=text, start_index=0, end_index=len(text), sources=[source]
+    )
+
+
+async def test_web_search_without_citations(gemini_mock):
+    mock_response = SimpleNamespace(
+        text="Test search result",
+        candidates=[SimpleNamespace(grounding_metadata=None)],
+    )
+    mock_client, _ = gemini_mock
     mock_client.aio.models.generate_content.return_value = mock_response
 
     # Call the function
     result = await web_search(query="test query")
 
     # Assertions
-    assert result == {"text": "Test search result"}
+    assert result == TextToolOutput(text="Test search result")
     mock_client.aio.models.generate_content.assert_called_once()
 
 
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-async def test_web_search_with_citations(mock_get_gemini_client):
-    # Mock the async client and its methods
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Test search result with citations"
-
+async def test_web_search_with_citations(gemini_mock):
     # Mock grounding metadata
-    mock_metadata = AsyncMock()
-    mock_metadata.web_search_queries = ["query1", "query2"]
-    mock_metadata.grounding_attributions = [
-        {"url": "http://example.com/1", "title": "Source 1"},
-        {"url": "http://example.com/2", "title": "Source 2"},
-    ]
-
-    # Mock candidates
-    mock_candidate = AsyncMock()
-    mock_candidate.grounding_metadata = mock_metadata
-    mock_response.candidates = [mock_candidate]
+    mock_metadata = SimpleNamespace(
+        web_search_queries=["query1", "query2"],
+        grounding_attributions=[
+            {"url": "http://example.com/1", "title": "Source 1"},
+            {"url": "http://example.com/2", "title": "Source 2"},
+        ],
+    )
+    mock_response = SimpleNamespace(
+        text="Test search result with citations",
+        candidates=[SimpleNamespace(grounding_metadata=mock_metadata)],
+    )
+    mock_client, _ = gemini_mock
+    mock_client.aio.models.generate_content.return_value = mock_response
 
     # Mock process_grounding_to_structured_citations
     with patch(
         "gemini_mcp.tools.process_grounding_to_structured_citations"
     ) as mock_process:
         mock_process.return_value = [
-            {"url": "http://example.com/1", "title": "Source 1"},
-            {"url": "http://example.com/2", "title": "Source 2"},
+            _citation("Claim 1", Source(title="Source 1", uri="http://example.com/1")),
+            _citation("Claim 2", Source(title="Source 2", uri="http://example.com/2")),
         ]
 
-        mock_client.aio.models.generate_content.return_value = mock_response
-
         # Call the function
         result = await web_search(query="test query", include_citations=True)
 
         # Assertions
-        assert "text" in result
-        assert result["text"] == "Test search result with citations"
-        assert "web_search_queries" in result
-        assert result["web_search_queries"] == ["query1", "query2"]
-        assert "citations" in result
-        assert len(result["citations"]) == 2
+        assert isinstance(result, WebSearchToolOutput)
+        assert result.text == "Test search result with citations"
+        assert result.web_search_queries == ["query1", "query2"]
+        assert len(result.citations) == 2
         mock_client.aio.models.generate_content.assert_called_once()
         mock_process.assert_called_once_with(mock_metadata)
 
 
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-async def test_use_gemini(mock_get_gemini_client):
-    # Clear cache to ensure we get the default model
-    get_config_cached.cache_clear()
+@pytest.mark.parametrize(
+    "env, passed_model, expected_model",
+    [
+        ({}, None, "gemini-flash-lite-latest"),
+        ({}, "gemini-2.5-pro", "gemini-2.5-pro"),
+        # Backward compatibility: the old flash name maps to the default model
+        ({}, "gemini-flash-latest", "gemini-flash-lite-latest"),
+        ({}, "gemini-flash-lite-latest", "gemini-flash-lite-latest"),
+        ({"GEMINI_DEFAULT_MODEL": "gemini-2.5-flash"}, None, "gemini-2.5-flash"),
+        (
+            {"GEMINI_DEFAULT_MODEL": "gemini-2.5-flash"},
+            "gemini-flash-latest",
+            "gemini-2.5-flash",
+        ),
+        (
+            {"GEMINI_ADVANCED_MODEL": "gemini-2.5-flash"},
+            "gemini-2.5-pro",
+            "gemini-2.5-flash",
+        ),
+    ],
+    ids=[
+        "no-model",
+        "pro",
+        "flash-compat",
+        "explicit-default",
+        "env-default",
+        "env-default-flash-compat",
+        "env-advanced",
+    ],
+)
+async def test_use_gemini_model_selection(
+    gemini_mock, monkeypatch, env, passed_model, expected_model
+):
+    """Test which model use_gemini sends for each requested model and configuration."""
+    for key, value in env.items():
+        monkeypatch.setenv(key, value)
 
-    # Mock the async client and its methods
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Gemini test response"
+    mock_response = SimpleNamespace(text="Gemini test response")
+    mock_client, _ = gemini_mock
     mock_client.aio.models.generate_content.return_value = mock_response
 
-    # Call the function
-    result = await use_gemini(prompt="test prompt")
+    # Call the function, leaving out the model when none is passed
+    result = await use_gemini(
+        prompt="test prompt", **({"model": passed_model} if passed_model else {})
+    )
 
     # Assertions
-    assert result == {"text": "Gemini test response"}
+    assert result == TextToolOutput(text="Gemini test response")
     mock_client.aio.models.generate_content.assert_called_once_with(
-        model="gemini-flash-lite-latest",
+        model=expected_model,
         contents="test prompt",
     )
 
 
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-async def test_use_gemini_pro_model(mock_get_gemini_client):
-    # Mock the async client and its methods
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Gemini Pro test response"
-    mock_client.aio.models.generate_content.return_value = mock_response
-
-    # Call the function
-    result = await use_gemini(
-        prompt="test prompt", model="gemini-2.5-pro"
+async def test_web_search_citations_are_models(gemini_mock, recwarn):
+    """Test that citations are returned as models that serialize cleanly."""
+    _, mock_response = gemini_mock
+    mock_response.text = "Search result"
+    mock_response.candidates[0].grounding_metadata = SimpleNamespace(
+        web_search_queries=["query1"],
+        grounding_chunks=[
+            SimpleNamespace(web=SimpleNamespace(title="Source 1", uri="http://a/1"))
+        ],
+        grounding_supports=[
+            SimpleNamespace(
+                segment=SimpleNamespace(text="Claim", start_index=0, end_index=5),
+                grounding_chunk_indices=[0],
+            )
+        ],
     )
 
-    # Assertions
-    assert result == {"text": "Gemini Pro test response"}
-    mock_client.aio.models.generate_content.assert_called_once_with(
-        model="gemini-2.5-pro",
-        contents="test prompt",
-    )
+    result = await web_search(query="test query", include_citations=True)
+
+    assert result.citations[0].sources[0].title == "Source 1"
+    assert result.model_dump()["citations"] == [
+        {
+            "text": "Claim",
+            "start_index": 0,
+            "end_index": 5,
+            "sources": [{"title": "Source 1", "uri": "http://a/1"}],
+        }
+    ]
+    # No PydanticSerializationUnexpectedValue warnings from raw dicts
+    assert not recwarn.list
 
 
 # New tests for web_search with different configurations
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-@patch("gemini_mcp.tools.get_current_date")
-@patch("gemini_mcp.tools.get_model_for_web_search")
-async def test_web_search_with_custom_model(
-    mock_get_model, mock_get_date, mock_get_gemini_client
-):
+@pytest.mark.parametrize(
+    "frozen_config", [{"web_search_model": "gemini-2.5-pro"}], indirect=True
+)
+async def test_web_search_with_custom_model(gemini_mock, frozen_config):
     """Test web_search with a custom configured model."""
-    # Clear cache to ensure we get the mocked model
-    get_config_cached.cache_clear()
-
-    # Setup mocks
-    mock_get_model.return_value = "gemini-2.5-pro"
-    mock_get_date.return_value = "2023-01-01"
-
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Custom model search result"
-    mock_response.candidates = [AsyncMock()]
-    mock_response.candidates[0].grounding_metadata = None
+    mock_response = SimpleNamespace(
+        text="Custom model search result",
+        candidates=[SimpleNamespace(grounding_metadata=None)],
+    )
+    mock_client, _ = gemini_mock
     mock_client.aio.models.generate_content.return_value = mock_response
 
-    # Call the function
-    result = await web_search(query="test query")
+    # Setup mocks
+    with patch("gemini_mcp.tools.get_current_date", return_value="2023-01-01"):
+        # Call the function
+        result = await web_search(query="test query")
 
     # Assertions
-    assert result == {"text": "Custom model search result"}
+    assert result == TextToolOutput(text="Custom model search result")
     mock_client.aio.models.generate_content.assert_called_once_with(
         model="gemini-2.5-pro",
-        contents='Conduct targeted Google Searches to gather the most recent, credible information on "test query" and synthesize it into a verifiable text artifact.\n\nInstructions:\n- Query should ensure that the most current information is gathered. The current date is 2023-01-01.\n- Conduct multiple, diverse searches to gather comprehensive information.\n- Consolidate key findings while meticulously tracking the source(s) for each specific piece of information.\n- The output should be a well-written summary or report based on your search findings. \n- Only include the information found in the search results, don\'t make up any information.\n\nResearch Topic:\ntest query\n',
+        contents=WEB_SEARCH_PROMPT_TEMPLATE.format(
+            date="2023-01-01", query="test query"
+        ),
         config={
             "temperature": 0.0,
             "tools": [{"google_search": {}}],
@@ -159,290 +208,74 @@ async def test_web_search_with_custom_model(
     )
 
 
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-@patch("gemini_mcp.tools.get_current_date")
-@patch("gemini_mcp.tools.get_model_for_web_search")
-async def test_web_search_with_citations_custom_model(
-    mock_get_model, mock_get_date, mock_get_gemini_client
-):
+@pytest.mark.parametrize(
+    "frozen_config", [{"web_search_model": "gemini-2.5-pro"}], indirect=True
+)
+async def test_web_search_with_citations_custom_model(gemini_mock, frozen_config):
     """Test web_search with citations using a custom configured model."""
-    # Clear cache to ensure we get the mocked model
-    get_config_cached.cache_clear()
-
-    # Setup mocks
-    mock_get_model.return_value = "gemini-2.5-pro"
-    mock_get_date.return_value = "2023-01-01"
-
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Custom model search result with citations"
-
     # Mock grounding metadata
-    mock_metadata = AsyncMock()
-    mock_metadata.web_search_queries = ["custom query1", "custom query2"]
-    mock_metadata.grounding_attributions = [
-        {"url": "http://example.com/1", "title": "Source 1"},
-        {"url": "http://example.com/2", "title": "Source 2"},
-    ]
-
-    # Mock candidates
-    mock_candidate = AsyncMock()
-    mock_candidate.grounding_metadata = mock_metadata
-    mock_response.candidates = [mock_candidate]
-
-    # Mock process_grounding_to_structured_citations
-    with patch(
-        "gemini_mcp.tools.process_grounding_to_structured_citations"
-    ) as mock_process:
-        mock_process.return_value = [
+    mock_metadata = SimpleNamespace(
+        web_search_queries=["custom query1", "custom query2"],
+        grounding_attributions=[
             {"url": "http://example.com/1", "title": "Source 1"},
             {"url": "http://example.com/2", "title": "Source 2"},
-        ]
+        ],
+    )
+    mock_response = SimpleNamespace(
+        text="Custom model search result with citations",
+        candidates=[SimpleNamespace(grounding_metadata=mock_metadata)],
+    )
+    mock_client, _ = gemini_mock
+    mock_client.aio.models.generate_content.return_value = mock_response
 
-        mock_client.aio.models.generate_content.return_value = mock_response
+    # Setup mocks, including process_grounding_to_structured_citations
+    with patch.multiple(
+        "gemini_mcp.tools",
+        get_current_date=DEFAULT,
+        process_grounding_to_structured_citations=DEFAULT,
+    ) as mocks:
+        mocks["get_current_date"].return_value = "2023-01-01"
+        mock_process = mocks["process_grounding_to_structured_citations"]
+        mock_process.return_value = [
+            _citation("Claim 1", Source(title="Source 1", uri="http://example.com/1")),
+            _citation("Claim 2", Source(title="Source 2", uri="http://example.com/2")),
+        ]
 
         # Call the function
         result = await web_search(query="test query", include_citations=True)
 
         # Assertions
-        assert "text" in result
-        assert result["text"] == "Custom model search result with citations"
-        assert "web_search_queries" in result
-        assert result["web_search_queries"] == ["custom query1", "custom query2"]
-        assert "citations" in result
-        assert len(result["citations"]) == 2
+        assert isinstance(result, WebSearchToolOutput)
+        assert result.text == "Custom model search result with citations"
+        assert result.web_search_queries == ["custom query1", "custom query2"]
+        assert len(result.citations) == 2
         mock_client.aio.models.generate_content.assert_called_once()
         mock_process.assert_called_once_with(mock_metadata)
 
 
-# New tests for use_gemini with different configurations
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-@patch("gemini_mcp.config.get_default_model")
-async def test_use_gemini_with_default_config(
-    mock_get_default_model, mock_get_gemini_client
-):
-    """Test use_gemini with default configured model."""
-    # Clear cache to ensure we get the mocked model
-    get_config_cached.cache_clear()
-
-    # Setup mocks
-    mock_get_default_model.return_value = "gemini-flash-lite-latest"
-
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Default model response"
-    mock_client.aio.models.generate_content.return_value = mock_response
-
-    # Call the function without specifying model
-    result = await use_gemini(prompt="test prompt")
-
-    # Assertions
-    assert result == {"text": "Default model response"}
-    mock_client.aio.models.generate_content.assert_called_once_with(
-        model="gemini-flash-lite-latest",
-        contents="test prompt",
-    )
-
-
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-@patch("gemini_mcp.config.get_default_model")
-@patch("gemini_mcp.config.get_advanced_model")
-async def test_use_gemini_with_advanced_config(
-    mock_get_advanced_model, mock_get_default_model, mock_get_gemini_client
-):
-    """Test use_gemini with advanced configured model."""
-    # Clear cache to ensure we get the mocked models
-    get_config_cached.cache_clear()
-
-    # Setup mocks
-    mock_get_default_model.return_value = "gemini-flash-lite-latest"
-    mock_get_advanced_model.return_value = "gemini-2.5-pro"
-
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Advanced model response"
-    mock_client.aio.models.generate_content.return_value = mock_response
-
-    # Call the function with pro model
-    result = await use_gemini(prompt="test prompt", model="gemini-2.5-pro")
-
-    # Assertions
-    assert result == {"text": "Advanced model response"}
-    mock_client.aio.models.generate_content.assert_called_once_with(
-        model="gemini-2.5-pro",
-        contents="test prompt",
-    )
-
-
-# Tests for backward compatibility
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-@patch("gemini_mcp.config.get_default_model")
-async def test_use_gemini_backward_compatibility_flash(
-    mock_get_default_model, mock_get_gemini_client
-):
-    """Test backward compatibility for gemini-flash-latest model."""
-    # Clear cache to ensure we get the mocked model
-    get_config_cached.cache_clear()
-
-    # Setup mocks
-    mock_get_default_model.return_value = "gemini-flash-lite-latest"
-
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Backward compatibility response"
-    mock_client.aio.models.generate_content.return_value = mock_response
-
-    # Call the function with the old flash model name
-    result = await use_gemini(
-        prompt="test prompt", model="gemini-flash-latest"
-    )
-
-    # Should use the default model (backward compatibility)
-    assert result == {"text": "Backward compatibility response"}
-    mock_client.aio.models.generate_content.assert_called_once_with(
-        model="gemini-flash-lite-latest",  # Uses default model
-        contents="test prompt",
-    )
-
-
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-@patch("gemini_mcp.config.get_default_model")
-@patch("gemini_mcp.config.get_advanced_model")
-async def test_use_gemini_backward_compatibility_pro(
-    mock_get_advanced_model, mock_get_default_model, mock_get_gemini_client
-):
-    """Test backward compatibility for gemini-2.5-pro model."""
-    # Clear cache to ensure we get the mocked models
-    get_config_cached.cache_clear()
-
-    # Setup mocks
-    mock_get_default_model.return_value = "gemini-flash-lite-latest"
-    mock_get_advanced_model.return_value = (
-        "gemini-2.5-pro"  # Updated to match the actual model name
-    )
-
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Pro backward compatibility response"
-    mock_client.aio.models.generate_content.return_value = mock_response
-
-    # Call the function with the old pro model name
-    result = await use_gemini(
-        prompt="test prompt", model="gemini-2.5-pro"
-    )
-
-    # Should use the advanced model
-    assert result == {"text": "Pro backward compatibility response"}
-    mock_client.aio.models.generate_content.assert_called_once_with(
-        model="gemini-2.5-pro",  # Uses advanced model
-        contents="test prompt",
-    )
-
-
-# Tests for model selection logic with different configurations
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-@patch("gemini_mcp.config.get_default_model")
-@patch("gemini_mcp.config.get_advanced_model")
-async def test_use_gemini_model_selection_explicit_default(
-    mock_get_advanced_model, mock_get_default_model, mock_get_gemini_client
-):
-    """Test model selection when explicit default model is provided."""
-    # Clear cache to ensure we get the mocked models
-    get_config_cached.cache_clear()
-
-    # Setup mocks
-    mock_get_default_model.return_value = "gemini-flash-lite-latest"
-    mock_get_advanced_model.return_value = "gemini-2.5-pro"
-
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Explicit default response"
-    mock_client.aio.models.generate_content.return_value = mock_response
-
-    # Call the function with explicit default model
-    result = await use_gemini(prompt="test prompt", model="gemini-flash-lite-latest")
-
-    # Should use the specified model
-    assert result == {"text": "Explicit default response"}
-    mock_client.aio.models.generate_content.assert_called_once_with(
-        model="gemini-flash-lite-latest",
-        contents="test prompt",
-    )
-
-
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-@patch("gemini_mcp.config.get_default_model")
-@patch("gemini_mcp.config.get_advanced_model")
-async def test_use_gemini_model_selection_no_model_specified(
-    mock_get_advanced_model, mock_get_default_model, mock_get_gemini_client
-):
-    """Test model selection when no model is specified."""
-    # Clear cache to ensure we get the mocked models
-    get_config_cached.cache_clear()
-
-    # Setup mocks
-    mock_get_default_model.return_value = "gemini-flash-lite-latest"
-    mock_get_advanced_model.return_value = "gemini-2.5-pro"
-
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "No model specified response"
-    mock_client.aio.models.generate_content.return_value = mock_response
-
-    # Call the function without specifying model
-    result = await use_gemini(prompt="test prompt")
-
-    # Should use the default model
-    assert result == {"text": "No model specified response"}
-    mock_client.aio.models.generate_content.assert_called_once_with(
-        model="gemini-flash-lite-latest",
-        contents="test prompt",
-    )
-
-
 # Tests for environment variable configuration integration
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-@patch("gemini_mcp.tools.get_model_for_web_search")
-@patch.dict(os.environ, {"GEMINI_WEB_SEARCH_MODEL": "gemini-2.5-pro"})
-async def test_web_search_with_env_config(mock_get_model, mock_get_gemini_client):
+async def test_web_search_with_env_config(gemini_mock, monkeypatch):
     """Test web_search with environment variable configuration."""
-    # Clear cache to ensure we get the mocked model
-    get_config_cached.cache_clear()
+    monkeypatch.setenv("GEMINI_WEB_SEARCH_MODEL", "gemini-2.5-pro")
 
-    # Setup mocks
-    mock_get_model.return_value = "gemini-2.5-pro"
-
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Env config search result"
-    mock_response.candidates = [AsyncMock()]
-    mock_response.candidates[0].grounding_metadata = None
+    mock_response = SimpleNamespace(
+        text="Env config search result",
+        candidates=[SimpleNamespace(grounding_metadata=None)],
+    )
+    mock_client, _ = gemini_mock
     mock_client.aio.models.generate_content.return_value = mock_response
 
-    # Call the function
-    result = await web_search(query="test query")
+    with patch("gemini_mcp.tools.get_current_date", return_value="2023-01-01"):
+        # Call the function
+        result = await web_search(query="test query")
 
     # Assertions
-    assert result == {"text": "Env config search result"}
+    assert result == TextToolOutput(text="Env config search result")
     mock_client.aio.models.generate_content.assert_called_once_with(
         model="gemini-2.5-pro",
-        contents='Conduct targeted Google Searches to gather the most recent, credible information on "test query" and synthesize it into a verifiable text artifact.\n\nInstructions:\n- Query should ensure that the most current information is gathered. The current date is 2025-10-15.\n- Conduct multiple, diverse searches to gather comprehensive information.\n- Consolidate key findings while meticulously tracking the source(s) for each specific piece of information.\n- The output should be a well-written summary or report based on your search findings. \n- Only include the information found in the search results, don\'t make up any information.\n\nResearch Topic:\ntest query\n',
+        contents=WEB_SEARCH_PROMPT_TEMPLATE.format(
+            date="2023-01-01", query="test query"
+        ),
         config={
             "temperature": 0.0,
             "tools": [{"google_search": {}}],
@@ -450,69 +283,24 @@ async def test_web_search_with_env_config(mock_get_model, mock_get_gemini_client
     )
 
 
-@pytest.mark.asyncio
-@patch("gemini_mcp.tools.get_gemini_client")
-@patch("gemini_mcp.config.get_default_model")
-@patch.dict(os.environ, {"GEMINI_DEFAULT_MODEL": "gemini-flash-lite-latest"})
-async def test_use_gemini_with_env_config(
-    mock_get_default_model, mock_get_gemini_client
-):
-    """Test use_gemini with environment variable configuration."""
-    # Clear cache to ensure we get the mocked model
-    get_config_cached.cache_clear()
-
-    # Setup mocks
-    mock_get_default_model.return_value = "gemini-flash-lite-latest"
-
-    mock_client = AsyncMock()
-    mock_get_gemini_client.return_value = mock_client
-    mock_response = AsyncMock()
-    mock_response.text = "Env config response"
-    mock_client.aio.models.generate_content.return_value = mock_response
-
-    # Call the function without specifying model
-    result = await use_gemini(prompt="test prompt")
-
-    # Assertions
-    assert result == {"text": "Env config response"}
-    mock_client.aio.models.generate_content.assert_called_once_with(
-        model="gemini-flash-lite-latest",
-        contents="test prompt",
+@pytest.mark.parametrize(
+    "metadata, expected",
+    [
+        (None, []),
+        # Metadata lacking grounding_supports
+        (SimpleNamespace(), []),
+        (SimpleNamespace(grounding_supports=[]), []),
+    ],
+    ids=["none", "no-grounding-supports", "empty-grounding-supports"],
+)
+def test_process_grounding_to_structured_citations_without_supports(metadata, expected):
+    """Test process_grounding_to_structured_citations when there is nothing to cite."""
+    assert process_grounding_to_structured_citations(metadata) == expected
+
+
+@pytest.mark.parametrize("query", ["test query", "{query} with {braces}", ""])
+def test_format_web_search_prompt_matches_template(query):
+    """Test that the pre-split prompt matches formatting the template directly."""
+    assert _format_web_search_prompt(query, "2023-01-01") == web_search_prompt.format(
+        query=query, current_date_str="2023-01-01"
     )
-
-
-# Test for process_grounding_to_structured_citations function
-def test_process_grounding_to_structured_citations_with_none():
-    """Test process_grounding_to_structured_citations with None input."""
-    from gemini_mcp.utils import process_grounding_to_structured_citations
-
-    # Test with None input
-    result = process_grounding_to_structured_citations(None)
-    assert result == []
-
-
-def test_process_grounding_to_structured_citations_with_no_grounding_supports():
-    """Test process_grounding_to_structured_citations with metadata lacking grounding_supports."""
-    from gemini_mcp.utils import process_grounding_to_structured_citations
-
-    # Create mock metadata without grounding_supports
-    class MockMetadata:
-        pass
-
-    mock_metadata = MockMetadata()
-    result = process_grounding_to_structured_citations(mock_metadata)
-    assert result == []
-
-
-def test_process_grounding_to_structured_citations_with_empty_grounding_supports():
-    """Test process_grounding_to_structured_citations with empty grounding_supports."""
-    from gemini_mcp.utils import process_grounding_to_structured_citations
-
-    # Create mock metadata with empty grounding_supports
-    class MockMetadata:
-        def __init__(self):
-            self.grounding_supports = []
-
-    mock_metadata = MockMetadata()
-    result = process_grounding_to_structured_citations(mock_metadata)
-    assert result == []
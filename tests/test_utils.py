@@ -0,0 +1,215 @@
+import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+from starlette.datastructures import State
+
+from gemini_mcp import utils
+from gemini_mcp.utils import (
+    CitationEntry,
+    Source,
+    TextToolOutput,
+    get_current_date,
+    get_gemini_client,
+    process_grounding_to_structured_citations,
+    reset_gemini_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_client_cache():
+    reset_gemini_client()
+    yield
+    reset_gemini_client()
+    # Runs after monkeypatch has restored MCP_TRANSPORT_MODE
+    utils.refresh_transport_mode()
+
+
+async def test_get_gemini_client_reuses_client_for_same_key(monkeypatch):
+    """Test that the Gemini client is constructed once per API key."""
+    monkeypatch.setenv("MCP_TRANSPORT_MODE", "stdio")
+    utils.refresh_transport_mode()
+    monkeypatch.setenv("GEMINI_API_KEY", "AI-test-key")
+
+    with patch("google.genai.Client") as mock_client_cls:
+        client1 = await get_gemini_client()
+        client2 = await get_gemini_client()
+
+    assert client1 is client2
+    mock_client_cls.assert_called_once_with(
+        api_key="AI-test-key", http_options=utils._get_http_options()
+    )
+
+
+async def test_get_gemini_client_separate_clients_per_key(monkeypatch):
+    """Test that different API keys get different Gemini clients."""
+    monkeypatch.setenv("MCP_TRANSPORT_MODE", "stdio")
+    utils.refresh_transport_mode()
+
+    with patch("google.genai.Client", side_effect=lambda **kwargs: object()):
+        monkeypatch.setenv("GEMINI_API_KEY", "AI-key-1")
+        client1 = await get_gemini_client()
+        monkeypatch.setenv("GEMINI_API_KEY", "AI-key-2")
+        client2 = await get_gemini_client()
+
+    assert client1 is not client2
+
+
+async def test_get_gemini_client_cache_is_bounded(monkeypatch):
+    """Test that the least recently used client is evicted once the cache is full."""
+    monkeypatch.setenv("MCP_TRANSPORT_MODE", "stdio")
+    utils.refresh_transport_mode()
+    monkeypatch.setattr(utils, "_CLIENT_CACHE_MAXSIZE", 2)
+
+    with patch("google.genai.Client", side_effect=lambda **kwargs: object()):
+        for key in ["AI-key-1", "AI-key-2", "AI-key-1", "AI-key-3"]:
+            monkeypatch.setenv("GEMINI_API_KEY", key)
+            await get_gemini_client()
+
+    assert list(utils._CLIENT_CACHE) == ["AI-key-1", "AI-key-3"]
+
+
+async def test_get_gemini_client_invalid_transport_mode(monkeypatch):
+    """Test that an unknown transport mode is rejected when a client is requested."""
+    monkeypatch.setenv("MCP_TRANSPORT_MODE", "sse")
+    utils.refresh_transport_mode()
+
+    with pytest.raises(ValueError, match="Invalid MCP_TRANSPORT_MODE: sse"):
+        await get_gemini_client()
+
+
+async def test_reset_gemini_client(monkeypatch):
+    """Test that resetting the cache creates a new client for the same key."""
+    monkeypatch.setenv("MCP_TRANSPORT_MODE", "stdio")
+    utils.refresh_transport_mode()
+    monkeypatch.setenv("GEMINI_API_KEY", "AI-test-key")
+
+    with patch("google.genai.Client", side_effect=lambda **kwargs: object()):
+        client1 = await get_gemini_client()
+        reset_gemini_client()
+        client2 = await get_gemini_client()
+
+    assert client1 is not client2
+
+
+def test_get_current_date():
+    """Test that the current local date is returned in YYYY-MM-DD format."""
+    assert get_current_date() == datetime.datetime.now().strftime("%Y-%m-%d")
+
+
+def test_get_current_date_rolls_over_at_local_midnight(monkeypatch):
+    """Test that the cached date is reused within a day and refreshed after midnight."""
+    monkeypatch.setattr(utils, "_DATE_CACHE", [0.0, ""])
+    clock = SimpleNamespace(now=datetime.datetime(2025, 10, 15, 23, 59).timestamp())
+    monkeypatch.setattr(utils, "time", SimpleNamespace(time=lambda: clock.now))
+
+    assert get_current_date() == "2025-10-15"
+    expires_at = utils._DATE_CACHE[0]
+
+    clock.now = datetime.datetime(2025, 10, 15, 23, 59, 59).timestamp()
+    assert get_current_date() == "2025-10-15"
+    assert utils._DATE_CACHE[0] == expires_at
+
+    clock.now = datetime.datetime(2025, 10, 16, 0, 0).timestamp()
+    assert get_current_date() == "2025-10-16"
+
+
+def _grounding_metadata():
+    chunks = [
+        SimpleNamespace(
+            web=SimpleNamespace(title="Source 1", uri="http://example.com/1")
+        ),
+        SimpleNamespace(
+            web=SimpleNamespace(title="Source 2", uri="http://example.com/2")
+        ),
+    ]
+    supports = [
+        SimpleNamespace(
+            segment=SimpleNamespace(text="First claim", start_index=None, end_index=11),
+            grounding_chunk_indices=[0],
+        ),
+        SimpleNamespace(
+            segment=SimpleNamespace(text="Second claim", start_index=12, end_index=24),
+            grounding_chunk_indices=[1, 0],
+        ),
+    ]
+    return SimpleNamespace(grounding_chunks=chunks, grounding_supports=supports)
+
+
+def test_process_grounding_to_structured_citations():
+    """Test that grounding supports are mapped to citations with their sources."""
+    result = process_grounding_to_structured_citations(_grounding_metadata())
+
+    assert result == [
+        CitationEntry(
+            text="First claim",
+            start_index=0,
+            end_index=11,
+            sources=[Source(title="Source 1", uri="http://example.com/1")],
+        ),
+        CitationEntry(
+            text="Second claim",
+            start_index=12,
+            end_index=24,
+            sources=[
+                Source(title="Source 2", uri="http://example.com/2"),
+                Source(title="Source 1", uri="http://example.com/1"),
+            ],
+        ),
+    ]
+
+
+def test_process_grounding_skips_chunks_without_web():
+    """Test that chunks without web data are left out of a citation's sources."""
+    metadata = _grounding_metadata()
+    metadata.grounding_chunks.append(SimpleNamespace(web=None))
+    metadata.grounding_supports[1].grounding_chunk_indices = [2, 1]
+
+    result = process_grounding_to_structured_citations(metadata)
+
+    assert result[1].sources == [Source(title="Source 2", uri="http://example.com/2")]
+
+
+async def test_get_gemini_client_reuses_client_within_request(monkeypatch):
+    """Test that the client resolved for an HTTP request is stored on its state."""
+    monkeypatch.setenv("MCP_TRANSPORT_MODE", "streamable-http")
+    utils.refresh_transport_mode()
+    request = SimpleNamespace(state=State({"bearer_token": "AI-test-key"}))
+    monkeypatch.setattr(utils, "get_http_request", lambda: request)
+
+    with patch("google.genai.Client") as mock_client_cls:
+        client1 = await get_gemini_client()
+        reset_gemini_client()
+        client2 = await get_gemini_client()
+
+    assert client1 is client2
+    assert request.state.gemini_client is client1
+    mock_client_cls.assert_called_once_with(
+        api_key="AI-test-key", http_options=utils._get_http_options()
+    )
+
+
+async def test_get_gemini_client_missing_bearer_token(monkeypatch):
+    """Test that streamable-http mode requires a bearer token on the request."""
+    monkeypatch.setenv("MCP_TRANSPORT_MODE", "streamable-http")
+    utils.refresh_transport_mode()
+    request = SimpleNamespace(state=State())
+    monkeypatch.setattr(utils, "get_http_request", lambda: request)
+
+    with pytest.raises(ValueError, match="Bearer token not found"):
+        await get_gemini_client()
+
+
+def test_gemini_client_accepts_shared_http_options():
+    """Test that google-genai accepts the shared HTTP options (no request is made)."""
+    client = utils._get_cached_client("AI-test-key")
+    assert utils._get_cached_client("AI-test-key") is client
+
+
+def test_tool_outputs_are_frozen():
+    """Test that tool output models cannot be mutated after construction."""
+    output = TextToolOutput.model_construct(text="result")
+    with pytest.raises(ValidationError):
+        output.text = "changed"